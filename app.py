@@ -1,19 +1,81 @@
 import streamlit as st
 import pickle
+import time
+import uuid
 import numpy as np
-import pandas as pd
 from scripts.ocr_preprocess import extract_text
 from scripts.multi_lang_ocr import extract_and_translate
 from scripts.loan_processing import predict_loan_eligibility
-from scripts.expenditure_analysis import analyze_bank_statement, convert_pdf_to_csv
-from scripts.document_processing import process_structured_document, process_unstructured
+from scripts.expenditure_analysis import analyze_bank_statement, load_bank_statement_pdf
+from scripts.document_processing import process_structured_document, process_unstructured, extract_text_from_pdf
 from scripts.stock_market_analyzer import compare_stocks  # ✅ Import for Stock Market Analysis
+from scripts.instrumentation import render_timing_panel  # ✅ Per-stage timings (BFSI_METRICS=1)
+from scripts.job_queue import JobQueue, QueueFullError, UploadedBytes, FAILED
+from scripts.data_loading import read_typed, read_compact  # ✅ Memory-lean typed CSV loading
 
 # ✅ Load Custom CSS
 def load_css():
     with open("styles.css") as f:
         st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
 
+# ✅ Shared Background Job Queue (one per server process, shared by all sessions)
+@st.cache_resource
+def get_job_queue():
+    return JobQueue(max_workers=2, max_pending=8, per_user_limit=2)
+
+def get_user_id():
+    if "user_id" not in st.session_state:
+        st.session_state["user_id"] = uuid.uuid4().hex
+    return st.session_state["user_id"]
+
+# ✅ Run heavy OCR/parsing in the background and poll until the result is ready
+def run_in_background(kind, uploaded_file, func):
+    """
+    Submits func for the uploaded file (or attaches to an identical in-flight job) and polls its progress.
+    Args:
+        kind: Job kind, used together with the file bytes to detect duplicate submissions
+        uploaded_file: Streamlit UploadedFile
+        func: Callable taking (file, progress=callback)
+    Returns:
+        The job result once finished, or None if the job was refused or failed
+    """
+    queue = get_job_queue()
+    data = uploaded_file.getvalue()
+    key = JobQueue.make_key(kind, data)
+    session_jobs = st.session_state.setdefault("jobs", {})
+    session_results = st.session_state.setdefault("job_results", {})  # kind -> (key, result)
+
+    # ✅ The latest collected result per kind lives in the session, so reruns never redo the OCR/parse
+    #    (only one result per kind is kept so earlier uploads don't pile up in server memory)
+    cached_key, cached_result = session_results.get(kind, (None, None))
+    if cached_key == key:
+        return cached_result
+
+    job = queue.get(session_jobs[key]) if key in session_jobs else None
+    if job is None:
+        try:
+            session_jobs[key] = queue.submit(
+                key, get_user_id(), func,
+                UploadedBytes(data, name=uploaded_file.name, type=uploaded_file.type)
+            )
+        except QueueFullError as e:
+            st.warning(f"⏳ {e}")
+            return None
+        job = queue.get(session_jobs[key])
+
+    if not job.finished:
+        pages = f"{job.done_steps}/{job.total_steps} pages" if job.total_steps else "starting"
+        st.progress(job.fraction, text=f"⏳ Processing {uploaded_file.name}... {pages}")
+        time.sleep(1)
+        st.rerun()
+
+    del session_jobs[key]  # ✅ A failed job is retried on the next submission
+    if job.state == FAILED:
+        st.error(f"⚠️ Error processing {uploaded_file.name}: {job.error}")
+        return None
+    session_results[kind] = (key, job.result)
+    return job.result
+
 # ✅ Load Loan Prediction Model
 loan_model = pickle.load(open("models/loan_approval_model.pkl", "rb"))
 
@@ -24,6 +86,9 @@ load_css()  # ✅ Apply Custom Styling
 menu = ["OCR Extraction", "Multi-Language OCR", "Bank Statement Analysis", "Loan Prediction"]
 choice = st.sidebar.selectbox("🔹 Select a Feature", menu)
 
+# ✅ Stage Timing Panel (only shown when BFSI_METRICS=1; rendered early so polling reruns and errors never skip it)
+render_timing_panel()
+
 # ✅ OCR Extraction
 if choice == "OCR Extraction":
     st.header("📜 Extract & Visualize Data from Documents")
@@ -45,7 +110,7 @@ if choice == "OCR Extraction":
 
         if uploaded_file is not None:
             st.subheader("📊 Original Data Before Clustering")
-            df = pd.read_csv(uploaded_file)
+            df = read_compact(uploaded_file)
             st.write(df)
 
             clustered_df = process_unstructured(uploaded_file)  # ✅ Perform Clustering
@@ -58,12 +123,15 @@ if choice == "OCR Extraction":
 
         if uploaded_file is not None:
             if doc_type == "Bank Statements":
-                csv_path = convert_pdf_to_csv(uploaded_file)  # ✅ Convert PDF to CSV
-                df = pd.read_csv(csv_path)  # ✅ Read converted CSV
-                analyze_bank_statement(df)  # ✅ Perform Expenditure Analysis
+                df = run_in_background("bank_statement", uploaded_file, load_bank_statement_pdf)  # ✅ Convert PDF in the background
+                if df is not None:
+                    analyze_bank_statement(df.copy())  # ✅ Perform Expenditure Analysis
 
             elif doc_category == "Structured":
-                process_structured_document(uploaded_file, doc_type)
+                # ✅ PDF text extraction runs in the background; regex parsing & charts need the script thread
+                extracted_text = run_in_background("structured_text", uploaded_file, extract_text_from_pdf)
+                if extracted_text is not None:
+                    process_structured_document(uploaded_file, doc_type, extracted_text=extracted_text)
 
 # ✅ Multi-Language OCR
 elif choice == "Multi-Language OCR":
@@ -71,9 +139,12 @@ elif choice == "Multi-Language OCR":
     uploaded_file = st.file_uploader("📂 Upload a file", type=["png", "jpg", "jpeg", "tiff", "pdf", "docx"])
 
     if uploaded_file is not None:
-        extracted_text, translated_text = extract_and_translate(uploaded_file)
-        st.text_area("📝 Original Text:", extracted_text, height=150)
-        st.text_area("🌐 Translated Text:", translated_text, height=150)
+        result = run_in_background("multi_lang_ocr", uploaded_file, extract_and_translate)  # ✅ Non-blocking OCR
+
+        if result is not None:
+            extracted_text, translated_text = result
+            st.text_area("📝 Original Text:", extracted_text, height=150)
+            st.text_area("🌐 Translated Text:", translated_text, height=150)
 
 # ✅ Bank Statement Analysis
 elif choice == "Bank Statement Analysis":
@@ -82,12 +153,12 @@ elif choice == "Bank Statement Analysis":
 
     if uploaded_file is not None:
         if uploaded_file.name.endswith(".pdf"):
-            csv_path = convert_pdf_to_csv(uploaded_file)  # Convert PDF to CSV
-            df = pd.read_csv(csv_path)  # Read converted CSV
+            df = run_in_background("bank_statement", uploaded_file, load_bank_statement_pdf)  # Convert PDF in the background
         else:
-            df = pd.read_csv(uploaded_file)  # Read directly if CSV uploaded
+            df = read_typed(uploaded_file, "bank_statement")  # Read directly if CSV uploaded
 
-        analyze_bank_statement(df)  # Perform analysis
+        if df is not None:
+            analyze_bank_statement(df.copy())  # Perform analysis
 
 # ✅ Loan Prediction System
 elif choice == "Loan Prediction":
@@ -0,0 +1,204 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+from scripts.instrumentation import span, annotate, file_size, metrics_enabled
+
+# ✅ Use the multithreaded pyarrow CSV parser when it is installed
+try:
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = "pyarrow"
+    TEXT_DTYPE = "string[pyarrow]"
+except ImportError:
+    CSV_ENGINE = "c"
+    TEXT_DTYPE = "object"
+
+REPORT_SAMPLE_ROWS = 10_000
+DATE_DTYPE = "datetime64[ns]"  # Fixed unit so chunks and files always agree
+
+# ✅ Schema Registry (Known CSV Inputs → Columns, Compact Dtypes & Date Columns)
+# Money columns stay 64-bit so large balances keep their exact rupee/paise values.
+SCHEMAS = {
+    # Output of convert_pdf_to_csv / uploaded bank statement CSVs
+    "bank_statement": {
+        "usecols": ["Date", "Narration", "Transaction Type", "Amount"],
+        "dtype": {
+            "Narration": TEXT_DTYPE,
+            "Transaction Type": "category",  # Categories inferred so spellings like CR/CREDIT are kept
+            "Amount": "float64",
+        },
+        "dates": {"Date": "%d-%m-%Y"},
+    },
+    # data/loan_approval_data.csv (exam ranks are needed to build Selected_Exam_Rank)
+    "loan_applicants": {
+        "usecols": [
+            "Marks_10th", "Marks_12th", "CGPA", "Parents_Credit_Score", "Student_Credit_Score",
+            "Total_Assets", "Fixed_Deposit", "JEE_Rank", "SAT_Score", "CAT_Rank", "NEET_Rank",
+            "Loan_Approved",
+        ],
+        "dtype": {
+            "Marks_10th": "int8",
+            "Marks_12th": "int8",
+            "CGPA": "float32",
+            "Parents_Credit_Score": "int16",
+            "Student_Credit_Score": "int16",
+            "Total_Assets": "int64",
+            "Fixed_Deposit": "int64",
+            "JEE_Rank": "int32",
+            "SAT_Score": "int16",
+            "CAT_Rank": "int32",
+            "NEET_Rank": "int32",
+            "Loan_Approved": "int8",
+        },
+        "dates": {},
+    },
+}
+
+
+def memory_usage_mb(df):
+    """
+    Returns the deep memory usage of a DataFrame in megabytes.
+    """
+    return df.memory_usage(deep=True).sum() / (1024 ** 2)
+
+
+def _parse_dates(df, schema):
+    """
+    Parses each date column with the schema's format, then ISO 8601 (2024-10-05, 2024/10/05),
+    and only then day-first inference (05/10/2024) for whatever is still unparsed.
+    """
+    for column, date_format in schema["dates"].items():
+        raw = df[column]
+        parsed = pd.to_datetime(raw, format=date_format, errors="coerce").astype(DATE_DTYPE)
+        for fallback in ({"format": "ISO8601"}, {"format": "mixed", "dayfirst": True}):
+            unparsed = parsed.isna() & raw.notna()
+            if not unparsed.any():
+                break
+            parsed[unparsed] = pd.to_datetime(raw[unparsed], errors="coerce", **fallback).astype(DATE_DTYPE)
+        df[column] = parsed
+    return df
+
+
+def _annotate_frame(df, source=None):
+    # ✅ The deep memory scan is O(rows), so only pay for it when metrics are being recorded
+    if metrics_enabled():
+        annotate(rows=len(df), bytes=file_size(source) if source is not None else None,
+                 memory_bytes=int(df.memory_usage(deep=True).sum()))
+
+
+def read_typed(source, schema_name, report=False):
+    """
+    Reads a known CSV with only the needed columns and compact dtypes.
+    Args:
+        source: File path or file-like object (e.g. Streamlit upload)
+        schema_name: Key in SCHEMAS
+        report: Print memory usage with default inference vs typed loading
+    Returns:
+        DataFrame
+    """
+    schema = SCHEMAS[schema_name]
+    with span(f"read_typed.{schema_name}"):
+        df = pd.read_csv(source, usecols=schema["usecols"], dtype=schema["dtype"], engine=CSV_ENGINE)
+        df = _parse_dates(df, schema)
+        _annotate_frame(df, source)
+
+    if report:
+        report_memory(source, schema_name, df)
+    return df
+
+
+def report_memory(source, schema_name, df, sample_rows=REPORT_SAMPLE_ROWS):
+    """
+    Prints the memory a typed DataFrame uses next to what default inference would have used.
+    The default-dtype figure is extrapolated from a sample so the report never loads the file twice.
+    """
+    if hasattr(source, "seek"):
+        source.seek(0)
+    sample = pd.read_csv(source, nrows=sample_rows)
+    scale = len(df) / len(sample) if len(sample) else 0
+    untyped_mb = memory_usage_mb(sample) * scale
+    print(f"📦 {schema_name}: ~{untyped_mb:.2f} MB with default dtypes → {memory_usage_mb(df):.2f} MB typed")
+
+
+def iter_typed(source, schema_name, chunksize=100_000):
+    """
+    Yields typed DataFrame chunks so very large exports never have to fit in memory at once.
+    The pyarrow engine cannot stream chunks, so this always uses the C parser.
+    Categorical columns get per-chunk categories; combine chunks with concat_chunks().
+    """
+    schema = SCHEMAS[schema_name]
+    reader = pd.read_csv(source, usecols=schema["usecols"], dtype=schema["dtype"], chunksize=chunksize)
+    first_source = source  # ✅ Count the file size once, on the first chunk
+    while True:
+        with span(f"iter_typed.{schema_name}"):
+            chunk = next(reader, None)
+            if chunk is None:
+                break
+            chunk = _parse_dates(chunk, schema)
+            _annotate_frame(chunk, first_source)
+            first_source = None
+        yield chunk
+
+
+def concat_chunks(chunks):
+    """
+    Concatenates typed chunks, unioning categorical columns so they stay categorical
+    (plain pd.concat falls back to object when chunk categories differ).
+    """
+    chunks = list(chunks)
+    if not chunks:
+        return pd.DataFrame()
+    categorical = [column for column, dtype in chunks[0].dtypes.items() if isinstance(dtype, pd.CategoricalDtype)]
+    merged = {column: union_categoricals([chunk[column] for chunk in chunks]) for column in categorical}
+    df = pd.concat([chunk.drop(columns=categorical) for chunk in chunks], ignore_index=True)
+    for column in categorical:
+        df[column] = pd.Categorical(merged[column])
+    return df[chunks[0].columns]
+
+
+def read_compact(source, category_ratio=0.5):
+    """
+    Reads an arbitrary CSV (no registered schema) and shrinks it after loading:
+    integer columns are downcast, float columns only when float32 holds every value exactly,
+    and low-cardinality text columns become categoricals.
+    Args:
+        source: File path or file-like object
+        category_ratio: Text columns with fewer unique values than this share of rows become categoricals
+    Returns:
+        DataFrame
+    """
+    with span("read_compact"):
+        df = pd.read_csv(source, engine=CSV_ENGINE)
+        for column in df.columns:
+            series = df[column]
+            if pd.api.types.is_integer_dtype(series):
+                df[column] = pd.to_numeric(series, downcast="integer")
+            elif pd.api.types.is_float_dtype(series):
+                downcast = pd.to_numeric(series, downcast="float")
+                if np.array_equal(downcast.to_numpy(dtype="float64"), series.to_numpy(dtype="float64"), equal_nan=True):
+                    df[column] = downcast  # ✅ Lossless only, so amounts like 61.94 are never altered
+            elif (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)) \
+                    and len(df) and series.nunique() < category_ratio * len(df):
+                df[column] = series.astype("category")
+        _annotate_frame(df, source)
+    return df
+
+
+# ✅ Self-check for statement date parsing: python -m scripts.data_loading
+if __name__ == "__main__":
+    import io
+    sample = io.StringIO(
+        "Date,Narration,Transaction Type,Amount\n"
+        "24-09-2024,UPI/A,Credit,1.00\n"   # dd-mm-yyyy (statement format)
+        "2024-10-05,UPI/B,Debit,2.00\n"    # ISO
+        "2024/10/05,UPI/C,Debit,3.00\n"    # ISO with slashes
+        "05/10/2024,UPI/D,CR,4.00\n"       # dd/mm/yyyy
+    )
+    expected = pd.to_datetime(["2024-09-24", "2024-10-05", "2024-10-05", "2024-10-05"])
+    for label, frame in [
+        ("read_typed", read_typed(sample, "bank_statement")),
+        ("iter_typed", concat_chunks(iter_typed(io.StringIO(sample.getvalue()), "bank_statement", chunksize=2))),
+    ]:
+        assert frame["Date"].tolist() == expected.tolist(), (label, frame["Date"].tolist())
+        assert isinstance(frame["Transaction Type"].dtype, pd.CategoricalDtype), label
+        assert frame["Transaction Type"].tolist() == ["Credit", "Debit", "Debit", "CR"], label
+    print("✅ Date parsing and categorical checks passed")
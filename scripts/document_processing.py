@@ -11,15 +11,21 @@ import os
 from sklearn.cluster import KMeans
 from scripts.expenditure_analysis import analyze_bank_statement
 from scripts.stock_market_analyzer import compare_stocks  # ✅ Semi-Structured Data Processing
+from scripts.instrumentation import timed, annotate, file_size
+from scripts.data_loading import read_compact
 
 # ✅ Extract Text from PDFs
-def extract_text_from_pdf(pdf_path):
+@timed("extract_text_from_pdf")
+def extract_text_from_pdf(pdf_path, progress=None):
     text = ""
     with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
+        annotate(pages=len(pdf.pages))
+        for page_number, page in enumerate(pdf.pages, start=1):
             page_text = page.extract_text()
             if page_text:
                 text += page_text + "\n"
+            if progress:
+                progress(page_number, len(pdf.pages))  # ✅ Pages done / total
     return text.strip()
 
 # ✅ Extract Text from Images (Unstructured Data - Cheques)
@@ -29,8 +35,11 @@ def extract_text_from_image(image_path):
     return pytesseract.image_to_string(thresh)
 
 # ✅ Structured Data Processing (Bank Statements, P&L, Balance Sheet, Cash Flow, Invoice)
-def process_structured_document(uploaded_file, doc_type):
-    extracted_text = extract_text_from_pdf(uploaded_file)
+@timed("process_structured_document")
+def process_structured_document(uploaded_file, doc_type, extracted_text=None):
+    annotate(bytes=file_size(uploaded_file))
+    if extracted_text is None:  # ✅ Callers may pass text already extracted in the background
+        extracted_text = extract_text_from_pdf(uploaded_file)
     structured_data = {}
 
     if doc_type == "Bank Statements":
@@ -60,6 +69,7 @@ def process_semi_structured():
     compare_stocks()
 
 # ✅ Unstructured Data Processing (CSV Clustering) - FIXED ERROR!
+@timed("process_unstructured")
 def process_unstructured(uploaded_file):
     try:
         st.subheader("📂 Uploaded CSV Data (Before Clustering)")
@@ -69,15 +79,17 @@ def process_unstructured(uploaded_file):
             tmp_file.write(uploaded_file.getbuffer())
         
         file_path = "temp_uploaded_file.csv"
+        annotate(bytes=os.path.getsize(file_path))
 
         # ✅ Read the file as a DataFrame
-        df = pd.read_csv(file_path)
+        df = read_compact(file_path)
 
         # ✅ Check if CSV has data
         if df.empty:
             st.error("⚠️ The uploaded CSV file is empty. Please upload a valid CSV file.")
             return None
 
+        annotate(rows=len(df))
         st.write("✅ Successfully Loaded CSV Data", df.head())
 
         # ✅ Select only numeric columns
@@ -2,25 +2,32 @@ import pandas as pd
 import pdfplumber
 import os
 import re
+import tempfile
 import matplotlib.pyplot as plt
 import seaborn as sns
 import streamlit as st
 from collections import Counter
+from scripts.instrumentation import timed, annotate, file_size
+from scripts.data_loading import read_typed
 
-def convert_pdf_to_csv(pdf_file):
+@timed("convert_pdf_to_csv")
+def convert_pdf_to_csv(pdf_file, output_csv="processed_data/bank_statement.csv", progress=None):
     """
     Extracts only Date, Transaction Type (Credit/Debit), Amount, and Narration from the bank statement.
     Args:
         pdf_file: Uploaded PDF file
+        output_csv: Path the CSV is written to
+        progress: Optional callback(pages_done, total_pages)
     Returns:
         csv_path: Path of the saved CSV file
     """
-    output_csv = "processed_data/bank_statement.csv"
-    os.makedirs("processed_data", exist_ok=True)  # Ensure directory exists
+    os.makedirs(os.path.dirname(output_csv) or ".", exist_ok=True)  # Ensure directory exists
 
+    annotate(bytes=file_size(pdf_file))
     transactions = []
     with pdfplumber.open(pdf_file) as pdf:
-        for page in pdf.pages:
+        annotate(pages=len(pdf.pages))
+        for page_number, page in enumerate(pdf.pages, start=1):
             text = page.extract_text()
             if text:
                 lines = text.split("\n")
@@ -34,8 +41,11 @@ def convert_pdf_to_csv(pdf_file):
                             transactions.append([date, narration.strip(), transaction_type, amount])
                         except ValueError:
                             continue  # Skip invalid transactions
+            if progress:
+                progress(page_number, len(pdf.pages))  # ✅ Pages done / total
 
     # Convert to DataFrame
+    annotate(rows=len(transactions))
     if transactions:
         df = pd.DataFrame(transactions, columns=["Date", "Narration", "Transaction Type", "Amount"])
         df.to_csv(output_csv, index=False)
@@ -43,6 +53,24 @@ def convert_pdf_to_csv(pdf_file):
     else:
         raise ValueError("No valid transactions found in the PDF.")
 
+def load_bank_statement_pdf(pdf_file, progress=None):
+    """
+    Converts a bank statement PDF straight into a DataFrame.
+    Uses a private temporary CSV so concurrent background jobs never overwrite each other's output.
+    Args:
+        pdf_file: Uploaded PDF file
+        progress: Optional callback(pages_done, total_pages)
+    Returns:
+        DataFrame: Date, Narration, Transaction Type, Amount
+    """
+    fd, tmp_csv = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+    try:
+        convert_pdf_to_csv(pdf_file, output_csv=tmp_csv, progress=progress)
+        return read_typed(tmp_csv, "bank_statement")
+    finally:
+        os.remove(tmp_csv)
+
 def extract_transaction_names(df):
     """
     Extracts merchant/person names from UPI or other transactions in the narration.
@@ -68,6 +96,7 @@ def extract_transaction_names(df):
     df["Transaction Name"] = extracted_names
     return df
 
+@timed("analyze_bank_statement")
 def analyze_bank_statement(df):
     """
     Analyzes bank statement data and generates insights & visualizations.
@@ -77,6 +106,7 @@ def analyze_bank_statement(df):
         str: Summary of analysis with visualizations
     """
     st.subheader("🏦 Bank Statement Analysis")
+    annotate(rows=len(df))
     df = extract_transaction_names(df)
 
     # Summary statistics
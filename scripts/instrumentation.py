@@ -0,0 +1,208 @@
+import os
+import json
+import time
+import threading
+import functools
+from contextlib import contextmanager
+
+# ✅ Metrics are off unless BFSI_METRICS=1 (or enable_metrics() is called)
+_ENABLED = os.environ.get("BFSI_METRICS", "0").lower() in ("1", "true", "yes")
+
+_lock = threading.Lock()
+_local = threading.local()
+
+# stage -> {"calls", "errors", "total_seconds", "max_seconds", "pages", "rows", "bytes", "memory_bytes", "cache_hits", "cache_misses"}
+_stage_metrics = {}
+_recent_spans = []
+_MAX_RECENT_SPANS = 200
+
+_COUNTERS = ("pages", "rows", "bytes", "memory_bytes", "cache_hits", "cache_misses")
+
+
+def enable_metrics(enabled=True):
+    """
+    Turns span recording on or off at runtime.
+    """
+    global _ENABLED
+    _ENABLED = bool(enabled)
+
+
+def metrics_enabled():
+    return _ENABLED
+
+
+def reset_metrics():
+    """
+    Clears all recorded stage metrics and recent spans.
+    """
+    with _lock:
+        _stage_metrics.clear()
+        del _recent_spans[:]
+
+
+def _new_stage_entry():
+    entry = {"calls": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+    entry.update({counter: 0 for counter in _COUNTERS})
+    return entry
+
+
+def _span_stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _record_span(span):
+    with _lock:
+        entry = _stage_metrics.setdefault(span["stage"], _new_stage_entry())
+        entry["calls"] += 1
+        entry["errors"] += 1 if span["error"] else 0
+        entry["total_seconds"] += span["seconds"]
+        entry["max_seconds"] = max(entry["max_seconds"], span["seconds"])
+        for counter in _COUNTERS:
+            entry[counter] += span["sizes"].get(counter, 0)
+
+        _recent_spans.append(span)
+        if len(_recent_spans) > _MAX_RECENT_SPANS:
+            del _recent_spans[0]
+
+
+@contextmanager
+def span(stage):
+    """
+    Times a block of work under the given stage name.
+    Sizes recorded with annotate() inside the block are attached to this span.
+    """
+    if not _ENABLED:
+        yield None
+        return
+
+    current = {"stage": stage, "sizes": {}, "error": False, "seconds": 0.0}
+    stack = _span_stack()
+    stack.append(current)
+    start = time.perf_counter()
+    try:
+        yield current
+    except Exception:
+        current["error"] = True
+        raise
+    finally:
+        current["seconds"] = time.perf_counter() - start
+        current["finished_at"] = time.time()
+        stack.pop()
+        _record_span(current)
+
+
+def timed(stage):
+    """
+    Decorator form of span(); calls straight through when metrics are disabled.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _ENABLED:
+                return func(*args, **kwargs)
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def annotate(**sizes):
+    """
+    Adds input sizes (pages, rows, file bytes), in-memory DataFrame bytes (memory_bytes)
+    or cache hits/misses to the innermost open span.
+    """
+    if not _ENABLED:
+        return
+    stack = _span_stack()
+    if not stack:
+        return
+    current = stack[-1]["sizes"]
+    for name, value in sizes.items():
+        if value is None:
+            continue
+        current[name] = current.get(name, 0) + value
+
+
+def file_size(file):
+    """
+    Returns the size in bytes of an uploaded file or path without moving its read position.
+    """
+    if hasattr(file, "size"):
+        return file.size
+    if hasattr(file, "getbuffer"):
+        return file.getbuffer().nbytes
+    if isinstance(file, (str, os.PathLike)) and os.path.exists(file):
+        return os.path.getsize(file)
+    return None
+
+
+def get_metrics():
+    """
+    Returns a snapshot of per-stage metrics.
+    """
+    with _lock:
+        return {stage: dict(entry) for stage, entry in _stage_metrics.items()}
+
+
+def get_recent_spans():
+    with _lock:
+        return [dict(recorded, sizes=dict(recorded["sizes"])) for recorded in _recent_spans]
+
+
+def export_json():
+    """
+    Exports per-stage metrics and recent spans as a JSON string.
+    """
+    return json.dumps({"stages": get_metrics(), "recent_spans": get_recent_spans()}, indent=2)
+
+
+def export_prometheus():
+    """
+    Exports per-stage metrics in the Prometheus text exposition format.
+    """
+    metrics = get_metrics()
+    lines = []
+
+    def emit(name, metric_type, help_text, field):
+        lines.append(f"# HELP bfsi_stage_{name} {help_text}")
+        lines.append(f"# TYPE bfsi_stage_{name} {metric_type}")
+        for stage, entry in sorted(metrics.items()):
+            lines.append(f'bfsi_stage_{name}{{stage="{stage}"}} {entry[field]}')
+
+    emit("calls_total", "counter", "Number of times the stage ran.", "calls")
+    emit("errors_total", "counter", "Number of times the stage raised an error.", "errors")
+    lines.append("# HELP bfsi_stage_duration_seconds Time spent in the stage.")
+    lines.append("# TYPE bfsi_stage_duration_seconds summary")
+    for stage, entry in sorted(metrics.items()):
+        lines.append(f'bfsi_stage_duration_seconds_sum{{stage="{stage}"}} {entry["total_seconds"]}')
+        lines.append(f'bfsi_stage_duration_seconds_count{{stage="{stage}"}} {entry["calls"]}')
+    emit("duration_seconds_max", "gauge", "Longest single run of the stage.", "max_seconds")
+    for counter in _COUNTERS:
+        emit(f"{counter}_total", "counter", f"Total {counter.replace('_', ' ')} seen by the stage.", counter)
+
+    return "\n".join(lines) + "\n"
+
+
+def render_timing_panel():
+    """
+    Shows a per-stage timing table in the Streamlit sidebar when metrics are enabled.
+    """
+    if not _ENABLED:
+        return
+
+    import streamlit as st
+    import pandas as pd
+
+    metrics = get_metrics()
+    with st.sidebar.expander("⏱️ Stage Timings"):
+        if not metrics:
+            st.write("No stages recorded yet.")
+            return
+        df = pd.DataFrame.from_dict(metrics, orient="index")
+        df["avg_seconds"] = df["total_seconds"] / df["calls"]
+        st.dataframe(df.round(4))
+        st.download_button("📥 Download JSON", export_json(), file_name="stage_metrics.json")
+        st.download_button("📥 Download Prometheus", export_prometheus(), file_name="stage_metrics.prom")
@@ -0,0 +1,144 @@
+import io
+import time
+import uuid
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from scripts.instrumentation import span, annotate
+
+# ✅ Job states
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class QueueFullError(RuntimeError):
+    """
+    Raised when a job is refused by admission control (queue full or per-user limit reached).
+    """
+
+
+class UploadedBytes(io.BytesIO):
+    """
+    In-memory copy of a Streamlit upload that background workers can read safely
+    after the script thread has moved on.
+    """
+    def __init__(self, data, name="", type=""):
+        super().__init__(data)
+        self.name = name
+        self.type = type
+        self.size = len(data)
+
+
+class Job:
+    """
+    A unit of background work with progress (pages done/total) and a result slot.
+    """
+    def __init__(self, job_id, key, user_id):
+        self.job_id = job_id
+        self.key = key
+        self.owner = user_id        # User whose submission started the job (counts toward their limit)
+        self.user_ids = {user_id}   # Everyone waiting on the result, including users who attached later
+        self.state = PENDING
+        self.done_steps = 0
+        self.total_steps = 0
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.finished_at = None
+
+    def report_progress(self, done, total):
+        self.done_steps = done
+        self.total_steps = total
+
+    @property
+    def finished(self):
+        return self.state in (DONE, FAILED)
+
+    @property
+    def fraction(self):
+        if self.finished:
+            return 1.0
+        if not self.total_steps:
+            return 0.0
+        return min(self.done_steps / self.total_steps, 1.0)
+
+
+class JobQueue:
+    """
+    Bounded worker pool for long-running OCR/analysis jobs.
+    Args:
+        max_workers: Number of jobs that run at the same time
+        max_pending: Maximum number of queued + running jobs before new work is refused
+        per_user_limit: Maximum number of unfinished jobs a single user may have started
+        result_ttl: Seconds a finished job is kept around for the UI to collect
+    """
+    def __init__(self, max_workers=2, max_pending=8, per_user_limit=2, result_ttl=600):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bfsi-job")
+        self._max_pending = max_pending
+        self._per_user_limit = per_user_limit
+        self._result_ttl = result_ttl
+        self._lock = threading.Lock()
+        self._jobs = {}       # job_id -> Job
+        self._in_flight = {}  # content key -> job_id
+
+    @staticmethod
+    def make_key(kind, data):
+        """
+        Builds a dedup key from the job kind and the uploaded file's bytes.
+        """
+        return f"{kind}:{hashlib.sha256(data).hexdigest()}"
+
+    def submit(self, key, user_id, func, *args, **kwargs):
+        """
+        Queues func(*args, progress=job.report_progress, **kwargs) and returns its job id.
+        A duplicate key attaches to the in-flight job instead of starting a new one.
+        """
+        with span("job_queue.submit"), self._lock:
+            self._purge_finished()
+
+            job_id = self._in_flight.get(key)
+            if job_id is not None:
+                self._jobs[job_id].user_ids.add(user_id)
+                annotate(cache_hits=1)
+                return job_id
+            annotate(cache_misses=1)
+
+            unfinished = [job for job in self._jobs.values() if not job.finished]
+            if len(unfinished) >= self._max_pending:
+                raise QueueFullError("The server is busy processing other documents. Please try again shortly.")
+            if sum(1 for job in unfinished if job.owner == user_id) >= self._per_user_limit:
+                raise QueueFullError("You already have documents being processed. Please wait for them to finish.")
+
+            job = Job(uuid.uuid4().hex, key, user_id)
+            self._jobs[job.job_id] = job
+            self._in_flight[key] = job.job_id
+
+        self._executor.submit(self._run, job, func, args, kwargs)
+        return job.job_id
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job, func, args, kwargs):
+        job.state = RUNNING
+        state = FAILED
+        try:
+            job.result = func(*args, progress=job.report_progress, **kwargs)
+            state = DONE
+        except Exception as e:
+            job.error = e
+        finally:
+            job.finished_at = time.time()  # ✅ Set before the state flips so purging never sees a finished job without it
+            job.state = state
+            with self._lock:
+                if self._in_flight.get(job.key) == job.job_id:
+                    del self._in_flight[job.key]
+
+    def _purge_finished(self):
+        cutoff = time.time() - self._result_ttl
+        expired = [job_id for job_id, job in self._jobs.items() if job.finished and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
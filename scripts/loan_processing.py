@@ -1,4 +1,5 @@
 import numpy as np
+from scripts.instrumentation import timed, annotate
 
 # Loan Schemes (Loan Name: [Min Loan, Max Loan])
 LOAN_SCHEMES = {
@@ -58,6 +59,7 @@ def find_suitable_loan(loan_amount):
     suitable_loans = [loan for loan, (min_amt, max_amt) in LOAN_SCHEMES.items() if min_amt <= loan_amount <= max_amt]
     return suitable_loans if suitable_loans else ["No suitable loan found"]
 
+@timed("predict_loan_eligibility")
 def predict_loan_eligibility(model, input_data):
     """
     Predicts loan eligibility and suggests a loan scheme if approved.
@@ -70,6 +72,7 @@ def predict_loan_eligibility(model, input_data):
         dict: {Approval Status, Approved Amount, Recommended Loan}
     """
     input_array = np.array(input_data).reshape(1, -1)  # Convert to 2D array
+    annotate(rows=input_array.shape[0])
     prediction = model.predict(input_array)[0]
 
     if prediction == 1:
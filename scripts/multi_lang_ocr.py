@@ -3,18 +3,30 @@ from PIL import Image
 import pdf2image
 import io
 from googletrans import Translator
+from scripts.instrumentation import timed, annotate, file_size
 
-def extract_and_translate(file):
+@timed("extract_and_translate")
+def extract_and_translate(file, progress=None):
     file_type = file.type
+    annotate(bytes=file_size(file))
     translator = Translator()
     
     if "image" in file_type:
         image = Image.open(file)
+        annotate(pages=1)
         extracted_text = pytesseract.image_to_string(image, lang='eng+hin+tam+kan+tel')
+        if progress:
+            progress(1, 1)
     
     elif file_type == "application/pdf":
         images = pdf2image.convert_from_bytes(file.read())
-        extracted_text = "\n".join([pytesseract.image_to_string(img, lang='eng+hin+tam+kan+tel') for img in images])
+        annotate(pages=len(images))
+        page_texts = []
+        for page_number, img in enumerate(images, start=1):
+            page_texts.append(pytesseract.image_to_string(img, lang='eng+hin+tam+kan+tel'))
+            if progress:
+                progress(page_number, len(images))  # ✅ Pages done / total
+        extracted_text = "\n".join(page_texts)
     
     else:
         extracted_text = "Unsupported file format"
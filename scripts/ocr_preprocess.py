@@ -3,16 +3,21 @@ from PIL import Image
 import pdf2image
 import docx
 import io
+from scripts.instrumentation import timed, annotate, file_size
 
+@timed("extract_text")
 def extract_text(file):
     file_type = file.type
+    annotate(bytes=file_size(file))
     
     if "image" in file_type:
         image = Image.open(file)
+        annotate(pages=1)
         text = pytesseract.image_to_string(image)
     
     elif file_type == "application/pdf":
         images = pdf2image.convert_from_bytes(file.read())
+        annotate(pages=len(images))
         text = "\n".join([pytesseract.image_to_string(img) for img in images])
     
     elif file_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
@@ -3,12 +3,9 @@ import numpy as np
 import pickle
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
+from scripts.data_loading import iter_typed, concat_chunks, report_memory
 
-# Load synthetic dataset
-df = pd.read_csv("data/loan_approval_data.csv")
-
-# Print actual column names to verify
-print("Dataset Columns:", df.columns)
+DATA_PATH = "data/loan_approval_data.csv"
 
 # Define the selected features
 selected_features = [
@@ -22,11 +19,18 @@ selected_features = [
     "Selected_Exam_Rank"
 ]
 
-# Create 'Selected_Exam_Rank' dynamically (selects one of the 4 exam ranks)
-df["Selected_Exam_Rank"] = df[["JEE_Rank", "SAT_Score", "CAT_Rank", "NEET_Rank"]].max(axis=1)
+# Stream the dataset in typed chunks; the 4 exam rank columns are reduced to
+# 'Selected_Exam_Rank' (the max of the 4) per chunk and never kept in full
+chunks = []
+for chunk in iter_typed(DATA_PATH, "loan_applicants"):
+    chunk["Selected_Exam_Rank"] = chunk[["JEE_Rank", "SAT_Score", "CAT_Rank", "NEET_Rank"]].max(axis=1)
+    chunks.append(chunk[selected_features + ["Loan_Approved"]])
+df = concat_chunks(chunks)
 
-# Select only required features + target column
-df = df[selected_features + ["Loan_Approved"]]
+# Print actual column names and memory usage to verify
+print("Dataset Columns:", df.columns)
+print("Dataset Dtypes:", df.dtypes.to_dict())
+report_memory(DATA_PATH, "loan_applicants", df)
 
 # Split dataset
 X = df[selected_features]